@@ -1,39 +1,136 @@
 import os
+import sys
 import argparse
-import whisper
-import warnings
+import logging
 from pathlib import Path
 from PIL import Image
-import piexif
 try:
-    import pyheif
-    HAS_PYHEIF = True
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    HAS_HEIF = True
 except ImportError:
-    HAS_PYHEIF = False
-from hachoir.parser import createParser
-from hachoir.metadata import extractMetadata
+    HAS_HEIF = False
 import subprocess
+import json
+import mimetypes
+import re
+import shutil
+import sqlite3
+import threading
+import multiprocessing
+from contextlib import nullcontext
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 
-# Suppress Whisper warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="whisper.transcribe")
+logger = logging.getLogger("ts2md")
 
-VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv'}
-IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.heic', '.tiff', '.bmp', '.gif'}
+LOG_FORMAT = "%(message)s"
 
-def is_video_file(file_path):
-    return file_path.suffix.lower() in VIDEO_EXTENSIONS
+def setup_logging(level):
+    # Root stays at INFO so --debug doesn't turn on other libraries' debug output
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, stream=sys.stdout)
+    logger.setLevel(level)
 
-def is_image_file(file_path):
-    return file_path.suffix.lower() in IMAGE_EXTENSIONS
+# Media kind by lowercased file extension
+EXT_KIND = {
+    **{e: 'video' for e in ('.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv')},
+    **{e: 'image' for e in ('.jpg', '.jpeg', '.png', '.heic', '.tiff', '.bmp', '.gif')},
+}
 
-def transcribe_audio(model, file_path):
-    print(f"Transcribing: {file_path}")
-    result = model.transcribe(str(file_path))
-    return result['text']
+# (meta key, markdown label) pairs written for each kind of file
+VIDEO_FIELDS: tuple[tuple[str, str], ...] = (
+    ('Creation Date', 'Creation Date'),
+    ('Description', 'Description'),
+    ('Duration', 'Video Length'),
+    ('Comment', 'Video Description'),
+    ('GPS', 'GPS'),
+    ('Make', 'Make'),
+    ('Model', 'Model'),
+    ('MIME Type', 'MIME Type'),
+    ('File Name', 'File Name'),
+    ('File Size', 'File Size'),
+    ('Image Width', 'Image Width'),
+    ('Image Height', 'Image Height'),
+)
+IMAGE_FIELDS: tuple[tuple[str, str], ...] = (
+    ('Creation Date', 'Creation Date'),
+    ('Description', 'Description'),
+    ('GPS', 'GPS'),
+    ('Make', 'Make'),
+    ('Model', 'Model'),
+    ('MIME Type', 'MIME Type'),
+    ('File Name', 'File Name'),
+    ('File Size', 'File Size'),
+    ('Image Width', 'Image Width'),
+    ('Image Height', 'Image Height'),
+)
+
+def file_kind(name):
+    return EXT_KIND.get(os.path.splitext(name)[1].lower())
+
+WHISPER_MODEL = "base"
+
+# Whisper model for the current worker process, loaded on first use
+_model = None
+
+def _transcribe_workers():
+    return max(1, (os.cpu_count() or 1) // 2)
+
+def _image_workers():
+    # Image metadata is I/O-bound, so oversubscribe the cores
+    return min(32, (os.cpu_count() or 1) * 4)
+
+def _init_worker(level):
+    # Spawned workers don't inherit the parent's logging setup
+    setup_logging(level)
+
+def _get_model():
+    # faster_whisper is imported here too, so image-only runs never load it
+    global _model
+    if _model is None:
+        from faster_whisper import WhisperModel
+        # int8 CTranslate2 kernels; split the cores between the pool workers
+        cpu_threads = max(1, (os.cpu_count() or 1) // _transcribe_workers())
+        _model = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+    return _model
+
+def transcribe_audio(file_path):
+    model = _get_model()
+    logger.info("Transcribing: %s", file_path)
+    # vad_filter skips silent regions so the decoder does less work
+    segments, _ = model.transcribe(str(file_path), beam_size=1, vad_filter=True)
+    return "".join(s.text for s in segments)
+
+# Numba GPS kernel, compiled on the first conversion so runs without GPS
+# tags never import numba; False when numba is not installed
+_rational_to_deg = None
+_gps_kernel_lock = threading.Lock()
+
+def _gps_kernel():
+    # Called from the image thread pool; the lock makes sure the kernel is
+    # compiled once
+    global _rational_to_deg
+    if _rational_to_deg is None:
+        with _gps_kernel_lock:
+            if _rational_to_deg is None:
+                try:
+                    import numba
+                except ImportError:
+                    _rational_to_deg = False
+                else:
+                    @numba.njit(cache=True, fastmath=True)
+                    def kernel(dn, dd, mn, md, sn, sd):
+                        return dn / dd + mn / md / 60.0 + sn / sd / 3600.0
+                    _rational_to_deg = kernel
+    return _rational_to_deg
 
 def exif_gps_to_decimal(gps):
     # gps: ((deg_num, deg_den), (min_num, min_den), (sec_num, sec_den))
+    kernel = _gps_kernel()
     def to_deg(val):
+        if kernel:
+            return float(kernel(float(val[0][0]), float(val[0][1]),
+                                float(val[1][0]), float(val[1][1]),
+                                float(val[2][0]), float(val[2][1])))
         return float(val[0][0]) / float(val[0][1]) + \
                float(val[1][0]) / float(val[1][1]) / 60 + \
                float(val[2][0]) / float(val[2][1]) / 3600
@@ -43,33 +140,64 @@ def exif_gps_to_decimal(gps):
         return lat, lon
     return None, None
 
-def extract_image_metadata(file_path):
+# EXIF sub-IFD pointers and tag IDs
+EXIF_IFD = 0x8769
+GPS_IFD = 0x8825
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_IMAGE_DESCRIPTION = 0x010E
+TAG_GPS_LATITUDE_REF = 1
+TAG_GPS_LATITUDE = 2
+TAG_GPS_LONGITUDE_REF = 3
+TAG_GPS_LONGITUDE = 4
+
+def _exif_str(value):
+    if isinstance(value, bytes):
+        return value.decode(errors='ignore').rstrip('\x00')
+    return str(value)
+
+def _exif_rationals(values):
+    # Pillow gives IFDRational values; convert to (num, den) pairs
+    return tuple((v.numerator, v.denominator) if hasattr(v, 'denominator') else (float(v), 1)
+                 for v in values)
+
+def extract_image_metadata(entry):
     meta = {}
+    file_path = Path(entry.path)
     try:
-        if file_path.suffix.lower() == '.heic':
-            if HAS_PYHEIF:
-                heif_file = pyheif.read(str(file_path))
-                meta['Image Size'] = f"{heif_file.size[0]}x{heif_file.size[1]}"
-                # HEIC EXIF extraction is limited, skip for now
-            else:
-                meta['error'] = 'pyheif not installed; cannot extract HEIC metadata.'
+        # With pillow-heif registered, HEIC goes through the same Pillow path
+        if file_path.suffix.lower() == '.heic' and not HAS_HEIF:
+            meta['error'] = 'pillow-heif not installed; cannot extract HEIC metadata.'
         else:
-            img = Image.open(file_path)
-            meta['Image Size'] = f"{img.width}x{img.height}"
-            exif_data = img.info.get('exif')
-            if exif_data:
-                exif_dict = piexif.load(exif_data)
+            # Only header fields are read, pixel data is never decoded. Pillow's
+            # Exif mapping parses sub-IFDs lazily, so only the IFDs we ask for
+            # (Exif, GPS) are decoded and the thumbnail IFD is skipped.
+            with Image.open(file_path) as img:
+                width, height = img.size
+                img_format = img.format
+                # The JPEG APP1 / PNG eXIf payload is already in info after
+                # Pillow's header parse, so the file is only opened once
+                exif_data = img.info.get('exif')
+                exif = Image.Exif()
+                if exif_data:
+                    exif.load(exif_data)
+                elif img_format not in ('JPEG', 'PNG'):
+                    # TIFF/HEIC keep EXIF outside info; PNG's getexif() would
+                    # load() the whole image, and JPEG has nothing more to find
+                    exif = img.getexif()
+                meta['Image Size'] = f"{width}x{height}"
                 # Get creation time
-                dt = exif_dict['Exif'].get(piexif.ExifIFD.DateTimeOriginal)
+                dt = exif.get_ifd(EXIF_IFD).get(TAG_DATETIME_ORIGINAL)
                 if dt:
-                    meta['Creation Date'] = dt.decode()
+                    meta['Creation Date'] = _exif_str(dt)
                 # Get GPS
-                gps = exif_dict.get('GPS')
-                if gps and piexif.GPSIFD.GPSLatitude in gps and piexif.GPSIFD.GPSLongitude in gps:
-                    lat_tuple = gps[piexif.GPSIFD.GPSLatitude]
-                    lon_tuple = gps[piexif.GPSIFD.GPSLongitude]
-                    lat_ref = gps.get(piexif.GPSIFD.GPSLatitudeRef, b'N').decode()
-                    lon_ref = gps.get(piexif.GPSIFD.GPSLongitudeRef, b'E').decode()
+                gps = exif.get_ifd(GPS_IFD)
+                if gps and TAG_GPS_LATITUDE in gps and TAG_GPS_LONGITUDE in gps:
+                    lat_tuple = _exif_rationals(gps[TAG_GPS_LATITUDE])
+                    lon_tuple = _exif_rationals(gps[TAG_GPS_LONGITUDE])
+                    lat_ref = _exif_str(gps.get(TAG_GPS_LATITUDE_REF, 'N'))
+                    lon_ref = _exif_str(gps.get(TAG_GPS_LONGITUDE_REF, 'E'))
                     lat, lon = exif_gps_to_decimal((lat_tuple, lon_tuple))
                     if lat_ref == 'S':
                         lat = -lat
@@ -77,178 +205,437 @@ def extract_image_metadata(file_path):
                         lon = -lon
                     meta['GPS'] = f"{lat:.6f}, {lon:.6f}"
                 # Get Make/Model
-                make = exif_dict['0th'].get(piexif.ImageIFD.Make)
+                make = exif.get(TAG_MAKE)
                 if make:
-                    meta['Make'] = make.decode(errors='ignore')
-                model = exif_dict['0th'].get(piexif.ImageIFD.Model)
+                    meta['Make'] = _exif_str(make)
+                model = exif.get(TAG_MODEL)
                 if model:
-                    meta['Model'] = model.decode(errors='ignore')
+                    meta['Model'] = _exif_str(model)
                 # Description
-                desc = exif_dict['0th'].get(piexif.ImageIFD.ImageDescription)
+                desc = exif.get(TAG_IMAGE_DESCRIPTION)
                 if desc:
-                    meta['Description'] = desc.decode(errors='ignore')
+                    meta['Description'] = _exif_str(desc)
             # File info
             meta['File Name'] = file_path.name
-            meta['File Size'] = f"{file_path.stat().st_size // 1024} KB"
-            meta['MIME Type'] = Image.MIME.get(img.format, 'unknown')
-            meta['Image Width'] = img.width
-            meta['Image Height'] = img.height
+            meta['File Size'] = f"{entry.stat().st_size >> 10} KB"
+            meta['MIME Type'] = Image.MIME.get(img_format, 'unknown')
+            meta['Image Width'] = str(width)
+            meta['Image Height'] = str(height)
     except Exception as e:
         meta['error'] = str(e)
     return meta
 
-def extract_video_metadata(file_path):
+# -j gives one JSON object per file, -n gives raw numbers (signed GPS
+# degrees, duration in seconds, file size in bytes)
+EXIFTOOL_TAGS = [
+    '-j',
+    '-n',
+    '-CreateDate',
+    '-CreationDate',
+    '-ModifyDate',
+    '-TrackCreateDate',
+    '-MediaCreateDate',
+    '-FileModifyDate',
+    '-FileName',
+    '-FileSize',
+    '-ImageWidth',
+    '-ImageHeight',
+    '-MIMEType',
+    '-Make',
+    '-Model',
+    '-GPSLatitude',
+    '-GPSLongitude',
+    '-GPSPosition',
+    '-Duration',
+    '-Comment',
+    '-Description',
+    '-UserComment',
+    '-XPComment',
+]
+
+# exiftool JSON tag names that map onto the keys the markdown writer reads
+EXIFTOOL_KEYS = {
+    'CreationDate': 'Creation Date',
+    'MIMEType': 'MIME Type',
+    'FileName': 'File Name',
+    'ImageWidth': 'Image Width',
+    'ImageHeight': 'Image Height',
+}
+
+def _format_duration(seconds):
+    # Same style exiftool uses: "12.34 s" for short clips, otherwise H:MM:SS
+    if seconds < 30:
+        return f"{seconds:.2f} s"
+    s = int(round(seconds))
+    return f"{s // 3600}:{s // 60 % 60:02d}:{s % 60:02d}"
+
+def parse_exiftool_output(output):
+    tags = json.loads(output)[0] if output.strip() else {}
+    tags.pop('SourceFile', None)
+    meta = {EXIFTOOL_KEYS.get(k, k): v for k, v in tags.items()}
+    if 'Duration' in tags:
+        meta['Duration'] = _format_duration(float(tags['Duration']))
+    if 'FileSize' in tags:
+        meta['File Size'] = f"{int(tags['FileSize']) >> 10} KB"
+        del meta['FileSize']
+    for key in ('Image Width', 'Image Height'):
+        if key in meta:
+            meta[key] = str(meta[key])
+    if 'GPSLatitude' in tags and 'GPSLongitude' in tags:
+        meta['GPS'] = f"{float(tags['GPSLatitude']):.6f}, {float(tags['GPSLongitude']):.6f}"
+    # Prefer Description, then UserComment, then XPComment, then Comment
+    desc = meta.get('Description') or meta.get('UserComment') or meta.get('XPComment') or meta.get('Comment')
+    meta['Description'] = desc if desc else ''
+    return meta
+
+class ExifToolSession:
+    """One `exiftool -stay_open` process shared by every video lookup.
+
+    Perl startup is paid once per run. The process is started on first use
+    and requests are serialized with a lock so worker threads can share it.
+    """
+
+    def __init__(self):
+        self.proc = None
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, path):
+        with self.lock:
+            # Restart the process if it has exited since the last call
+            if self.proc is not None and self.proc.poll() is not None:
+                self._discard()
+            if self.proc is None:
+                self.proc = subprocess.Popen(
+                    ['exiftool', '-stay_open', 'True', '-@', '-', '-common_args', *EXIFTOOL_TAGS],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, encoding='utf-8', errors='replace')
+            try:
+                self.proc.stdin.write(f"{path}\n-execute\n")
+                self.proc.stdin.flush()
+                lines = []
+                for line in self.proc.stdout:
+                    if line.strip() == '{ready}':
+                        return ''.join(lines)
+                    lines.append(line)
+            except OSError:
+                self._discard()
+                raise
+            # EOF without {ready}: exiftool died mid-request
+            self._discard()
+            raise RuntimeError('exiftool exited unexpectedly')
+
+    def _discard(self):
+        # Drop a dead or broken process so the next call starts a fresh one
+        proc, self.proc = self.proc, None
+        try:
+            proc.kill()
+        except OSError:
+            pass
+        proc.wait()
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.write("-stay_open\nFalse\n")
+            self.proc.stdin.close()
+        except Exception:
+            pass
+        self.proc.wait()
+        self.proc = None
+
+# ISO 6709 decimal-degree prefix, e.g. "+37.7749-122.4194+010.000/". The
+# decimal point is required so the (D)DDMM(SS) forms like "+4043-07400/"
+# don't match.
+ISO6709_RE = re.compile(r'^([+-]\d{2}\.\d+)([+-]\d{3}\.\d+)')
+
+def extract_video_metadata_ffprobe(entry):
+    # ffprobe only reads the container headers; returns None when there are no tags
+    result = subprocess.run([
+        'ffprobe', '-v', 'error', '-print_format', 'json',
+        '-show_entries', 'format=duration:format_tags:stream=codec_type,width,height',
+        entry.path
+    ], capture_output=True, text=True, encoding='utf-8', errors='replace')
+    if result.returncode != 0:
+        return None
+    info = json.loads(result.stdout or '{}')
+    fmt = info.get('format', {})
+    tags = {k.lower(): v for k, v in fmt.get('tags', {}).items()}
+    if not tags:
+        return None
     meta = {}
+    if 'creation_time' in tags:
+        meta['Creation Date'] = tags['creation_time']
+    if 'duration' in fmt:
+        meta['Duration'] = _format_duration(float(fmt['duration']))
+    location = tags.get('location') or tags.get('com.apple.quicktime.location.iso6709')
+    m = ISO6709_RE.match(location) if location else None
+    if m:
+        lat, lon = float(m.group(1)), float(m.group(2))
+        if abs(lat) <= 90 and abs(lon) <= 180:
+            meta['GPS'] = f"{lat:.6f}, {lon:.6f}"
+    make = tags.get('make') or tags.get('com.apple.quicktime.make')
+    if make:
+        meta['Make'] = make
+    model = tags.get('model') or tags.get('com.apple.quicktime.model')
+    if model:
+        meta['Model'] = model
+    if 'comment' in tags:
+        meta['Comment'] = tags['comment']
+    meta['Description'] = tags.get('description') or tags.get('comment') or ''
+    meta['MIME Type'] = mimetypes.guess_type(entry.name)[0] or 'unknown'
+    meta['File Name'] = entry.name
+    meta['File Size'] = f"{entry.stat().st_size >> 10} KB"
+    video = next((s for s in info.get('streams', []) if s.get('codec_type') == 'video'), None)
+    if video and 'width' in video:
+        meta['Image Width'] = str(video['width'])
+        meta['Image Height'] = str(video['height'])
+    return meta
+
+FFPROBE = shutil.which('ffprobe')
+
+def extract_video_metadata(entry, exiftool):
+    # Try ffprobe first and only fall back to exiftool when it had no tags
+    try:
+        meta = extract_video_metadata_ffprobe(entry) if FFPROBE else None
+    except Exception:
+        meta = None
+    if meta is not None:
+        return meta
     try:
-        # Use exiftool to extract metadata, including UserComment and XPComment
-        result = subprocess.run([
-            'exiftool',
-            '-CreateDate',
-            '-CreationDate',
-            '-ModifyDate',
-            '-TrackCreateDate',
-            '-MediaCreateDate',
-            '-FileModifyDate',
-            '-FileName',
-            '-FileSize',
-            '-ImageWidth',
-            '-ImageHeight',
-            '-MIMEType',
-            '-Make',
-            '-Model',
-            '-GPSLatitude',
-            '-GPSLongitude',
-            '-GPSPosition',
-            '-Duration',
-            '-Comment',
-            '-Description',
-            '-UserComment',
-            '-XPComment',
-            str(file_path)
-        ], capture_output=True, text=True)
-        for line in result.stdout.splitlines():
-            if ':' in line:
-                key, value = line.split(':', 1)
-                meta[key.strip()] = value.strip()
-        # Prefer Description, then UserComment, then XPComment, then Comment
-        desc = meta.get('Description') or meta.get('UserComment') or meta.get('XPComment') or meta.get('Comment')
-        meta['Description'] = desc if desc else ''
+        return parse_exiftool_output(exiftool.execute(entry.path))
     except Exception as e:
-        meta['error'] = str(e)
-    return meta
+        return {'error': str(e)}
+
+CACHE_PATH = Path.home() / '.cache' / 'ts2md' / 'meta.db'
+
+# Bump whenever extracted fields or their formatting change; older rows are
+# then simply never read again
+CACHE_VERSION = 2
+
+class MetadataCache:
+    """SQLite cache of extraction results keyed by (path, mtime, size).
+
+    Table names carry CACHE_VERSION (and the Whisper model for
+    transcriptions) so results from older code are not reused. Passing
+    path=None, or failing to open the database, gives a cache that never
+    hits and never stores anything.
+    """
+
+    TABLES = {
+        'metadata': f"metadata_v{CACHE_VERSION}",
+        'transcriptions': f"transcriptions_v{CACHE_VERSION}_{WHISPER_MODEL}",
+    }
+
+    def __init__(self, path=CACHE_PATH):
+        self.conn = None
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(path))
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            for table in self.TABLES.values():
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    "(path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, json TEXT)")
+            self.conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Cache disabled, cannot open %s: %s", path, e)
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn is None:
+            return
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
+
+    @staticmethod
+    def key(entry):
+        st = entry.stat()
+        return os.path.abspath(entry.path), st.st_mtime_ns, st.st_size
+
+    def get(self, table, key):
+        if self.conn is None:
+            return None
+        path, mtime, size = key
+        row = self.conn.execute(
+            f"SELECT json FROM {self.TABLES[table]} WHERE path = ? AND mtime = ? AND size = ?",
+            (path, mtime, size)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, table, key, value):
+        if self.conn is None:
+            return
+        try:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {self.TABLES[table]} (path, mtime, size, json) VALUES (?, ?, ?, ?)",
+                (*key, json.dumps(value)))
+            self.conn.commit()
+        except sqlite3.Error as e:
+            # e.g. a read-only database file; keep going without caching
+            logger.warning("Cache disabled, cannot write: %s", e)
+            self.conn.close()
+            self.conn = None
+
+def cached_submit(cache, table, key, executor, fn, *args):
+    # Returns (future, miss); cache hits come back as an already-completed future
+    value = cache.get(table, key)
+    if value is not None:
+        future = Future()
+        future.set_result(value)
+        return future, False
+    return executor.submit(fn, *args), True
+
+def collect(cache, table, key, job):
+    future, miss = job
+    try:
+        value = future.result()
+    except Exception as e:
+        # e.g. a video without an audio track; report it in that file's section
+        logger.error("Error: %s", e)
+        return {'error': str(e)}
+    # Don't persist failures so they are retried on the next run
+    if miss and not (isinstance(value, dict) and 'error' in value):
+        cache.put(table, key, value)
+    return value
 
 def main():
     parser = argparse.ArgumentParser(description="Transcribe video files to a Markdown file using Whisper and extract metadata.")
     parser.add_argument('-i', '--input', type=str, default='.', help='Input directory with media files (default: current directory)')
     parser.add_argument('-o', '--output', type=str, default='transcriptions.md', help='Output markdown file name (default: transcriptions.md)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the metadata/transcription cache')
     parser.add_argument('--debug', action='store_true', help='Debug mode: only process one video and one image file')
     args = parser.parse_args()
 
+    log_level = logging.DEBUG if args.debug else logging.INFO
+    setup_logging(log_level)
+
     input_dir = Path(args.input)
     output_file = Path(args.output)
 
     if not input_dir.exists() or not input_dir.is_dir():
-        print(f"Error: '{input_dir}' is not a valid directory.")
+        logger.error("Error: '%s' is not a valid directory.", input_dir)
         return
 
-    model = whisper.load_model("base")
-    files = [f for f in input_dir.iterdir() if f.is_file() and (is_video_file(f) or is_image_file(f))]
+    # DirEntry caches its stat result, so each file is stat'ed at most once.
+    # Each file is classified once here as (entry, kind).
+    files = []
+    with os.scandir(input_dir) as it:
+        for e in it:
+            kind = file_kind(e.name)
+            if kind is not None and e.is_file():
+                files.append((e, kind))
 
     if not files:
-        print(f"No media files found in '{input_dir}'.")
+        logger.info("No media files found in '%s'.", input_dir)
         return
 
     # Debug mode: only process one video and one image
     if args.debug:
-        video = next((f for f in files if is_video_file(f)), None)
-        image = next((f for f in files if is_image_file(f)), None)
+        video = next((f for f in files if f[1] == 'video'), None)
+        image = next((f for f in files if f[1] == 'image'), None)
         files = [f for f in [video, image] if f is not None]
-        print(f"[DEBUG] Processing files: {[str(f) for f in files]}")
-        for file in files:
-            print(f"[DEBUG] File: {file.name}")
-            if is_video_file(file):
-                meta = extract_video_metadata(file)
-                print("[DEBUG] Video Metadata:")
-                for k, v in meta.items():
-                    if k == 'Description' and not v:
-                        print(f"  {k}: Not found")
-                    else:
-                        print(f"  {k}: {v}")
-                print(f"[DEBUG] File System - Created: {file.stat().st_ctime}, Modified: {file.stat().st_mtime}")
-            elif is_image_file(file):
-                meta = extract_image_metadata(file)
-                print("[DEBUG] Image Metadata:")
-                for k, v in meta.items():
-                    if k == 'Description' and not v:
-                        print(f"  {k}: Not found")
-                    else:
-                        print(f"  {k}: {v}")
-                print(f"[DEBUG] File System - Created: {file.stat().st_ctime}, Modified: {file.stat().st_mtime}")
-
-    with output_file.open('w', encoding='utf-8') as md:
-        for file in sorted(files):
-            md.write(f"## {file.name}\n\n")
-            # Extract metadata
-            if is_video_file(file):
-                meta = extract_video_metadata(file)
-                md.write("**Metadata:**\n")
-                fields = [
-                    ('Creation Date', 'Creation Date'),
-                    ('Description', 'Description'),
-                    ('Duration', 'Video Length'),
-                    ('Comment', 'Video Description'),
-                    ('GPS', 'GPS'),
-                    ('Make', 'Make'),
-                    ('Model', 'Model'),
-                    ('MIME Type', 'MIME Type'),
-                    ('File Name', 'File Name'),
-                    ('File Size', 'File Size'),
-                    ('Image Width', 'Image Width'),
-                    ('Image Height', 'Image Height'),
-                ]
-                for key, label in fields:
-                    if key == 'Description':
-                        if key in meta and meta[key]:
-                            md.write(f"- {label}: {meta[key]}\n")
-                        else:
-                            md.write(f"- {label}: Not found\n")
-                    else:
+        logger.debug("[DEBUG] Processing files: %s", [e.path for e, _ in files])
+
+    # Everything is submitted up front: video and image metadata on their own
+    # thread pools, Whisper on the process pool. The writer then picks
+    # results up in output order, so extraction and markdown writing overlap
+    # with transcription. The Whisper pool is only created when there is at
+    # least one video.
+    has_videos = any(kind == 'video' for _, kind in files)
+    # Workers are spawned, not forked: the metadata thread pools are already
+    # running Popen and holding locks when the first transcription is submitted
+    whisper_ctx = ProcessPoolExecutor(max_workers=_transcribe_workers(), initializer=_init_worker,
+                                      initargs=(log_level,),
+                                      mp_context=multiprocessing.get_context('spawn')) if has_videos else nullcontext()
+    with MetadataCache(None if args.no_cache else CACHE_PATH) as cache, ExifToolSession() as exiftool, \
+            ThreadPoolExecutor(max_workers=4) as meta_pool, \
+            ThreadPoolExecutor(max_workers=_image_workers()) as image_pool, \
+            whisper_ctx as whisper_pool:
+        jobs = []
+        try:
+            for file, kind in sorted(files, key=lambda x: x[0].name):
+                cache_key = MetadataCache.key(file)
+                if kind == 'video':
+                    meta_job = cached_submit(cache, 'metadata', cache_key, meta_pool, extract_video_metadata, file, exiftool)
+                    text_job = cached_submit(cache, 'transcriptions', cache_key, whisper_pool, transcribe_audio, file.path)
+                else:
+                    meta_job = cached_submit(cache, 'metadata', cache_key, image_pool, extract_image_metadata, file)
+                    text_job = None
+                jobs.append((file, kind, cache_key, meta_job, text_job))
+
+            # Each file's section is assembled in memory and encoded/written in one go
+            with output_file.open('wb', buffering=1 << 20) as md:
+                for file, kind, cache_key, meta_job, text_job in jobs:
+                    meta = collect(cache, 'metadata', cache_key, meta_job)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("[DEBUG] File: %s", file.name)
+                        logger.debug("[DEBUG] %s Metadata:", kind.capitalize())
+                        for k, v in meta.items():
+                            if k == 'Description' and not v:
+                                logger.debug("  %s: Not found", k)
+                            else:
+                                logger.debug("  %s: %s", k, v)
+                        st = file.stat()
+                        logger.debug("[DEBUG] File System - Created: %s, Modified: %s", st.st_ctime, st.st_mtime)
+                    parts = []
+                    append = parts.append
+                    append(f"## {file.name}\n\n")
+                    # Extract metadata
+                    append("**Metadata:**\n")
+                    wrote = False
+                    for key, label in (VIDEO_FIELDS if kind == 'video' else IMAGE_FIELDS):
                         if key in meta:
-                            md.write(f"- {label}: {meta[key]}\n")
-                if not any(key in meta for key, _ in fields):
-                    md.write("- No metadata found\n")
-                text = transcribe_audio(model, file)
-                md.write("\n**Transcription:**\n\n")
-                md.write(f"{text}\n\n")
-            elif is_image_file(file):
-                meta = extract_image_metadata(file)
-                md.write("**Metadata:**\n")
-                fields = [
-                    ('Creation Date', 'Creation Date'),
-                    ('Description', 'Description'),
-                    ('GPS', 'GPS'),
-                    ('Make', 'Make'),
-                    ('Model', 'Model'),
-                    ('MIME Type', 'MIME Type'),
-                    ('File Name', 'File Name'),
-                    ('File Size', 'File Size'),
-                    ('Image Width', 'Image Width'),
-                    ('Image Height', 'Image Height'),
-                ]
-                for key, label in fields:
-                    if key == 'Description':
-                        if key in meta and meta[key]:
-                            md.write(f"- {label}: {meta[key]}\n")
+                            wrote = True
+                        if key == 'Description':
+                            if key in meta and meta[key]:
+                                append(f"- {label}: {meta[key]}\n")
+                            else:
+                                append(f"- {label}: Not found\n")
+                        elif key in meta:
+                            append(f"- {label}: {meta[key]}\n")
+                    if not wrote:
+                        append("- No metadata found\n")
+                    if kind == 'video':
+                        text = collect(cache, 'transcriptions', cache_key, text_job)
+                        append("\n**Transcription:**\n\n")
+                        if isinstance(text, dict):
+                            append(f"_Transcription failed: {text['error']}_\n\n")
                         else:
-                            md.write(f"- {label}: Not found\n")
+                            append(f"{text}\n\n")
                     else:
-                        if key in meta:
-                            md.write(f"- {label}: {meta[key]}\n")
-                if not any(key in meta for key, _ in fields):
-                    md.write("- No metadata found\n")
-                md.write("\n**Notes:** _(add your notes here)_\n\n")
+                        append("\n**Notes:** _(add your notes here)_\n\n")
+                    md.write("".join(parts).encode("utf-8"))
+        except BaseException:
+            # Drop queued work instead of letting the pools finish it on exit.
+            # The futures are cancelled directly as well, since the process
+            # pool's cancel_futures does not reliably drop them.
+            for job in jobs:
+                for future, _ in filter(None, job[3:]):
+                    future.cancel()
+            for pool in (meta_pool, image_pool, whisper_pool):
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+            raise
 
-    print(f"Transcription and metadata extraction completed. Markdown saved to: {output_file}")
+    logger.info("Transcription and metadata extraction completed. Markdown saved to: %s", output_file)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file